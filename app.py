@@ -14,25 +14,51 @@
 """
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from utils.logger import setup_logger
 from services.youtube import download_audio, get_video_info
-from services.transcript import get_youtube_transcript, transcribe_with_whisper
-from services.gemini import init_gemini, summarize, ask_question_stream
+from services.transcript import (
+    get_youtube_transcript, get_cached_transcript,
+    transcribe_with_whisper, preload_whisper_model
+)
+from services.retrieval import build_passage_index
+from services.gemini import (
+    init_gemini, summarize, start_qa_chat, ask_question_stream,
+    condense_transcript, CONDENSE_THRESHOLD,
+    create_transcript_cache, refresh_transcript_cache, delete_transcript_cache
+)
 from rich.console import Console
 
 console = Console()
 
 
+# --------------------------------------------------------------
+# Function: discard_audio
+# Purpose : Delete a speculatively downloaded audio file once its
+#           download finishes (used when captions were found).
+# --------------------------------------------------------------
+def discard_audio(audio_future):
+    audio_file = audio_future.result()
+    if audio_file and os.path.exists(audio_file):
+        os.remove(audio_file)
+
+
 # --------------------------------------------------------------
 # Function: main
 # Purpose : Entry point of the application.
 # Notes   : 
 #   1. Loads environment variables and API keys
-#   2. Fetches transcript (from "youtubetotranscript.com/transcript" or Whisper if error)
-#   3. Displays video metadata
+#   2. Fetches transcript (from disk cache, YouTube captions,
+#      "youtubetotranscript.com/transcript" or Whisper if error),
+#      downloading audio and loading Whisper in the background
+#      meanwhile on a cache miss
+#   3. Condenses very long transcripts and displays video metadata
 #   4. Summarizes video using Gemini
-#   5. Provides interactive Q&A with chat history
+#   5. Caches transcript as a Gemini context prefix, and indexes
+#      long transcripts for per-question passage retrieval
+#   6. Provides interactive Q&A with chat history
 # --------------------------------------------------------------
 def main():
     setup_logger()
@@ -41,15 +67,32 @@ def main():
 
     # Step 1: Ask user for YouTube URL
     url = console.input("[bold green]Enter YouTube URL:[/bold green] ").strip()
-    chat_history = []
 
-    # Step 2: Try fetching transcript from youtubetotranscript.com/transcript
-    transcript, lang = get_youtube_transcript(url)
+    # Step 2: Use a cached transcript if this video was processed before,
+    #         otherwise try YouTube captions / youtubetotranscript.com,
+    #         speculatively downloading audio for Whisper at the same time
+    transcript, lang = get_cached_transcript(url)
+    audio_future = None
+    cancel_download = threading.Event()
+    if not transcript:
+        preload_whisper_model()
+        executor = ThreadPoolExecutor(max_workers=2)
+        transcript_future = executor.submit(get_youtube_transcript, url)
+        audio_future = executor.submit(download_audio, url, cancel_event=cancel_download)
+        executor.shutdown(wait=False)
+        transcript, lang = transcript_future.result()
 
     # Step 3: If no transcript found, fall back to Whisper
-    if not transcript:
+    if transcript:
+        if audio_future:
+            # Stop the speculative download; delete it if it already finished
+            cancel_download.set()
+            audio_future.add_done_callback(discard_audio)
+    else:
         console.print("[red]No captions found. Falling back to Whisper...[/red]")
-        audio_file = download_audio(url)
+        # The speculative download skips the single-connection fallback,
+        # so download again on demand if it came back empty
+        audio_file = audio_future.result() or download_audio(url)
         if audio_file:
             transcript = transcribe_with_whisper(audio_file, url)
             lang = "auto"
@@ -58,7 +101,13 @@ def main():
         console.print("[bold red]Transcript not available.[/bold red]")
         return
 
-    # Step 4: Show video metadata
+    # Step 4: Condense very long transcripts for the summary
+    full_transcript = transcript
+    if len(transcript) > CONDENSE_THRESHOLD:
+        console.print("[yellow]Long transcript detected. Condensing it...[/yellow]")
+        transcript = condense_transcript(transcript)
+
+    # Step 5: Show video metadata
     video_info = get_video_info(url)
     console.print("\n=== [bold cyan]VIDEO INFO[/bold cyan] ===")
     console.print(f"[bold green]Title:[/bold green] {video_info['title']}")
@@ -68,18 +117,35 @@ def main():
 
     console.print(f"\n[bold green]Chosen subtitle language:[/bold green] {lang}")
 
-    # Step 5: Generate summary
+    # Step 6: Generate summary
     console.print("\n=== [bold cyan]SUMMARY[/bold cyan] ===\n")
     summarize(transcript, video_info)
 
-    # Step 6: Interactive Q&A loop
-    while True:
-        question = console.input("\n[bold green]Ask a question (or 'exit' to quit):[/bold green] ").strip()
-        if question.lower() in {"exit", "quit"}:
-            break
-
-        answer = ask_question_stream(transcript, video_info, question, chat_history)
-        chat_history.append((question, answer))
+    # Step 7: Cache transcript (condensed for long videos) + metadata once
+    #         and open a chat session. Long videos also index passages of
+    #         the full transcript so each question gets exact excerpts.
+    index = None
+    if len(full_transcript) > CONDENSE_THRESHOLD:
+        index = build_passage_index(full_transcript)
+    cache = create_transcript_cache(transcript, video_info)
+    chat = start_qa_chat(transcript, video_info, cache)
+
+    # Step 8: Interactive Q&A loop
+    try:
+        while True:
+            question = console.input("\n[bold green]Ask a question (or 'exit' to quit):[/bold green] ").strip()
+            if question.lower() in {"exit", "quit"}:
+                break
+
+            # Keep the transcript cache alive; if it already expired,
+            # continue the same conversation without it
+            if cache is not None and not refresh_transcript_cache(cache):
+                cache = None
+                chat = start_qa_chat(transcript, video_info, history=chat.history)
+
+            ask_question_stream(chat, question, index)
+    finally:
+        delete_transcript_cache(cache)
 
 
 if __name__ == "__main__":
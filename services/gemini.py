@@ -6,27 +6,213 @@
    - Initializing the Gemini client
    - Summarizing YouTube video transcript + metadata
    - Answering user questions about the video (Q&A)
+   - Caching the transcript prefix reused across Q&A turns
+   - Condensing very long transcripts before summary / Q&A
 ===============================================================
 """
 
 import logging
+import datetime
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
+from google.generativeai import caching
 from rich.console import Console
+from services.retrieval import split_transcript, retrieve_passages
 
 # Rich console for pretty printing in the terminal
 console = Console()
 
+# Gemini model name and per-task system instructions
+MODEL_NAME = "gemini-2.5-flash"
+SUMMARY_INSTRUCTION = "You are given a YouTube video's metadata and transcript. Summarize briefly."
+QA_INSTRUCTION = "Answer concisely using video metadata, transcript, and chat history."
+CONDENSE_INSTRUCTION = (
+    "You are given one part of a long YouTube video transcript. "
+    "Condense it, keeping all facts, names, numbers, and key statements."
+)
+
+# Cached Gemini models (built once and reused across calls)
+_summarizer_model = None
+_qa_model = None
+_condense_model = None
+
+# Transcripts longer than this (in chars) are condensed chunk by chunk
+CONDENSE_THRESHOLD = 60_000
+CONDENSE_CHUNK_SIZE = 15_000
+CONDENSE_WORKERS = 4
+
+# Number of most recent Q&A pairs kept in a chat session
+MAX_HISTORY_TURNS = 10
+
+# Smooth streaming: large chunks are re-emitted in small slices
+SMOOTH_CHUNK_THRESHOLD = 50
+SMOOTH_SLICE_SIZE = 4
+
+# Total delay spent re-emitting one chunk (seconds), so smoothing
+# never throttles the stream to a fixed chars/sec rate
+SMOOTH_CHUNK_BUDGET = 0.1
+
+# ANSI codes used when writing streamed text straight to stdout
+ANSI_YELLOW = "\x1b[33m"
+ANSI_RESET = "\x1b[0m"
+
 
 # --------------------------------------------------------------
 # Function: init_gemini
 # Purpose : Configure Gemini with the given API key
+#           and build the cached summarizer / Q&A models.
 # --------------------------------------------------------------
 def init_gemini(api_key: str):
     """
     Configure Gemini with API key.
     This must be called before using Gemini features.
     """
+    global _summarizer_model, _qa_model
     genai.configure(api_key=api_key)
+    _summarizer_model = genai.GenerativeModel(MODEL_NAME, system_instruction=SUMMARY_INSTRUCTION)
+    _qa_model = genai.GenerativeModel(MODEL_NAME, system_instruction=QA_INSTRUCTION)
+
+
+# --------------------------------------------------------------
+# Function: get_summarizer_model / get_qa_model
+# Purpose : Return the cached Gemini models, building them on
+#           first use if init_gemini() has not done so yet.
+# --------------------------------------------------------------
+def get_summarizer_model():
+    """
+    Return the cached summarizer model.
+
+    Returns:
+        genai.GenerativeModel: Model with the summary system instruction.
+    """
+    global _summarizer_model
+    if _summarizer_model is None:
+        _summarizer_model = genai.GenerativeModel(MODEL_NAME, system_instruction=SUMMARY_INSTRUCTION)
+    return _summarizer_model
+
+
+def get_qa_model():
+    """
+    Return the cached Q&A model.
+
+    Returns:
+        genai.GenerativeModel: Model with the Q&A system instruction.
+    """
+    global _qa_model
+    if _qa_model is None:
+        _qa_model = genai.GenerativeModel(MODEL_NAME, system_instruction=QA_INSTRUCTION)
+    return _qa_model
+
+
+def get_condense_model():
+    """
+    Return the cached transcript-condensing model.
+
+    Returns:
+        genai.GenerativeModel: Model with the condense system instruction.
+    """
+    global _condense_model
+    if _condense_model is None:
+        _condense_model = genai.GenerativeModel(MODEL_NAME, system_instruction=CONDENSE_INSTRUCTION)
+    return _condense_model
+
+
+# --------------------------------------------------------------
+# Function: _condense_chunk
+# Purpose : Condense one transcript chunk with Gemini.
+# Notes   : Falls back to the raw chunk on error so no content is lost.
+# --------------------------------------------------------------
+def _condense_chunk(chunk: str) -> str:
+    """
+    Condense a single transcript chunk.
+
+    Args:
+        chunk (str): Transcript chunk.
+
+    Returns:
+        str: Condensed text, or the original chunk on failure.
+    """
+    try:
+        return get_condense_model().generate_content(chunk).text.strip() or chunk
+    except Exception as e:
+        logging.error(f"Gemini chunk condensing error: {e}")
+        return chunk
+
+
+# --------------------------------------------------------------
+# Function: condense_transcript
+# Purpose : Shrink very long transcripts before summary / Q&A by
+#           condensing sentence-aligned chunks in parallel.
+# Notes   : Transcripts up to CONDENSE_THRESHOLD chars are returned as is.
+# --------------------------------------------------------------
+def condense_transcript(transcript: str) -> str:
+    """
+    Condense a long transcript with parallel per-chunk Gemini calls.
+
+    Args:
+        transcript (str): Full transcript text.
+
+    Returns:
+        str: Condensed transcript (or the original if short enough).
+    """
+    if len(transcript) <= CONDENSE_THRESHOLD:
+        return transcript
+
+    chunks = split_transcript(transcript, CONDENSE_CHUNK_SIZE)
+    with ThreadPoolExecutor(max_workers=CONDENSE_WORKERS) as executor:
+        condensed = list(executor.map(_condense_chunk, chunks))
+    return "\n\n".join(condensed)
+
+
+# --------------------------------------------------------------
+# Function: _stream_to_console
+# Purpose : Print a Gemini response stream and collect its text.
+# Notes   : Writes straight to stdout (one color code for the whole
+#           stream) to skip Rich's per-call markup parsing and locking.
+#           Chunks longer than SMOOTH_CHUNK_THRESHOLD are printed in
+#           small slices spread over SMOOTH_CHUNK_BUDGET seconds so
+#           bursty chunks don't freeze the output.
+# --------------------------------------------------------------
+def _stream_to_console(response_stream) -> str:
+    """
+    Print streamed Gemini text in yellow and return the full text.
+
+    Args:
+        response_stream: Iterable of Gemini response chunks.
+
+    Returns:
+        str: Concatenated text of all chunks.
+    """
+    color = console.is_terminal
+    out = sys.stdout
+    if color:
+        out.write(ANSI_YELLOW)
+
+    parts = []
+    try:
+        for chunk in response_stream:
+            text = chunk.text
+            if not text:
+                continue
+
+            if len(text) > SMOOTH_CHUNK_THRESHOLD:
+                slices = range(0, len(text), SMOOTH_SLICE_SIZE)
+                delay = SMOOTH_CHUNK_BUDGET / len(slices)
+                for i in slices:
+                    out.write(text[i:i + SMOOTH_SLICE_SIZE])
+                    out.flush()
+                    time.sleep(delay)
+            else:
+                out.write(text)
+                out.flush()
+            parts.append(text)
+    finally:
+        out.write(ANSI_RESET + "\n" if color else "\n")
+        out.flush()
+
+    return "".join(parts)
 
 
 # --------------------------------------------------------------
@@ -48,36 +234,17 @@ def summarize(transcript: str, video_info: dict) -> str:
         str: The final summary text.
     """
     try:
-        # Create Gemini model with a system instruction
-        model = genai.GenerativeModel(
-            "gemini-2.5-flash",
-            system_instruction="You are given a YouTube video's metadata and transcript. Summarize briefly."
-        )
+        # Reuse the cached summarizer model
+        model = get_summarizer_model()
 
         # Prompt includes video metadata + transcript
-        prompt = (
-            f"Video Info:\n"
-            f"Title: {video_info['title']}\n"
-            f"Channel: {video_info['channel']}\n"
-            f"Views: {video_info['views']}\n"
-            f"Description: {video_info['description']}\n\n"
-            f"Transcript:\n{transcript}"
-        )
+        prompt = build_video_context(transcript, video_info)
 
         console.print("[bold green]Summary:[/bold green]\n")
 
         # Generate content as a stream (prints as it comes)
         response_stream = model.generate_content(prompt, stream=True)
-
-        final_text = ""
-        for chunk in response_stream:
-            if chunk.text:
-                # Print streamed text in yellow
-                console.print(chunk.text, end="", style="yellow")
-                final_text += chunk.text
-
-        console.print()
-        return final_text
+        return _stream_to_console(response_stream)
 
     except Exception as e:
         logging.error(f"Gemini streaming summarization error: {e}")
@@ -85,64 +252,211 @@ def summarize(transcript: str, video_info: dict) -> str:
 
 
 # --------------------------------------------------------------
-# Function: ask_question_stream
-# Purpose : Answer user questions about the video by combining
-#           transcript, metadata, and chat history.
-# Notes   : Keeps conversational context for up to last 10 Q&As.
+# Function: create_transcript_cache
+# Purpose : Upload transcript + metadata once as a Gemini cached
+#           prefix so Q&A turns don't resend the whole transcript.
+# Notes   : Returns None if caching fails (e.g. transcript below the
+#           minimum cacheable size); callers fall back to full prompts.
 # --------------------------------------------------------------
-def ask_question_stream(transcript: str, video_info: dict, question: str, chat_history: list | None = None) -> str:
+def create_transcript_cache(transcript: str, video_info: dict, ttl_minutes: int = 60):
     """
-    Ask a question about transcript + video metadata with Gemini (streaming).
-    
+    Create a Gemini context cache holding the transcript + metadata.
+
     Args:
         transcript (str): Transcript of the video.
         video_info (dict): Video metadata like title, channel, etc.
-        question (str): The current user question.
-        chat_history (list, optional): Previous Q&A pairs for context.
+        ttl_minutes (int, optional): Cache lifetime. Defaults to 60.
 
     Returns:
-        str: The final answer text.
+        caching.CachedContent | None: Cache handle, or None on failure.
     """
     try:
-        # Initialize Gemini with context-specific instructions
-        model = genai.GenerativeModel(
-            "gemini-2.5-flash",
-            system_instruction="Answer concisely using video metadata, transcript, and chat history."
+        return caching.CachedContent.create(
+            model=f"models/{MODEL_NAME}",
+            system_instruction=QA_INSTRUCTION,
+            contents=[_content("user", build_video_context(transcript, video_info))],
+            ttl=datetime.timedelta(minutes=ttl_minutes)
         )
+    except Exception as e:
+        logging.warning(f"Gemini context caching unavailable, sending full transcript: {e}")
+        return None
+
+
+# --------------------------------------------------------------
+# Function: refresh_transcript_cache
+# Purpose : Push back the expiry of a transcript cache so long Q&A
+#           sessions don't outlive it.
+# Notes   : Returns False if the cache is gone (e.g. it already
+#           expired while the user was idle); callers should then
+#           continue without it.
+# --------------------------------------------------------------
+def refresh_transcript_cache(cache, ttl_minutes: int = 60) -> bool:
+    """
+    Extend the TTL of a Gemini context cache.
+
+    Args:
+        cache (caching.CachedContent): Cache handle to refresh.
+        ttl_minutes (int, optional): New lifetime from now. Defaults to 60.
+
+    Returns:
+        bool: True if the cache is still usable, False otherwise.
+    """
+    try:
+        cache.update(ttl=datetime.timedelta(minutes=ttl_minutes))
+        return True
+    except Exception as e:
+        logging.warning(f"Gemini context cache expired, sending full transcript: {e}")
+        return False
+
+
+# --------------------------------------------------------------
+# Function: delete_transcript_cache
+# Purpose : Remove a transcript cache created by create_transcript_cache.
+# --------------------------------------------------------------
+def delete_transcript_cache(cache):
+    """
+    Delete a Gemini context cache (no-op if cache is None).
+
+    Args:
+        cache (caching.CachedContent | None): Cache handle to delete.
+    """
+    if cache is None:
+        return
+    try:
+        cache.delete()
+    except Exception as e:
+        logging.error(f"Error deleting Gemini context cache: {e}")
 
-        # Prompt includes video metadata, transcript, and optional history
-        prompt = (
-            f"Video Info:\n"
-            f"Title: {video_info['title']}\n"
-            f"Channel: {video_info['channel']}\n"
-            f"Views: {video_info['views']}\n"
-            f"Description: {video_info['description']}\n\n"
-            f"Transcript:\n{transcript}\n\n"
-        )
 
-        # Add up to last 10 Q&A pairs from chat history
-        if chat_history:
-            for i, (q, a) in enumerate(chat_history[-10:], 1):
-                prompt += f"Q{i}: {q}\nA{i}: {a}\n\n"
+# --------------------------------------------------------------
+# Function: _content
+# Purpose : Wrap text as a role-tagged Gemini Content message.
+# --------------------------------------------------------------
+def _content(role: str, text: str):
+    """
+    Build a single-part Gemini Content message.
 
-        # Append the current question at the end
-        prompt += f"Current Question: {question}"
+    Args:
+        role (str): "user" or "model".
+        text (str): Message text.
+
+    Returns:
+        genai.protos.Content: Role-tagged message.
+    """
+    return genai.protos.Content(role=role, parts=[genai.protos.Part(text=text)])
+
+
+# --------------------------------------------------------------
+# Function: build_video_context
+# Purpose : Format video metadata + transcript as a prompt block.
+# --------------------------------------------------------------
+def build_video_context(transcript: str, video_info: dict) -> str:
+    """
+    Build the metadata + transcript block shared by summary and Q&A.
+
+    Args:
+        transcript (str): Transcript of the video.
+        video_info (dict): Video metadata like title, channel, etc.
+
+    Returns:
+        str: Formatted prompt block.
+    """
+    return (
+        f"Video Info:\n"
+        f"Title: {video_info['title']}\n"
+        f"Channel: {video_info['channel']}\n"
+        f"Views: {video_info['views']}\n"
+        f"Description: {video_info['description']}\n\n"
+        f"Transcript:\n{transcript}"
+    )
+
+
+# --------------------------------------------------------------
+# Function: start_qa_chat
+# Purpose : Open a Gemini chat session seeded with the video context.
+# Notes   : With a transcript cache the context lives in the cached
+#           prefix; otherwise it is sent once as the opening turn.
+#           history carries earlier Q&A turns over into the new session.
+# --------------------------------------------------------------
+def start_qa_chat(transcript: str, video_info: dict, cache=None, history=None):
+    """
+    Start a Q&A chat session about the video.
+
+    Args:
+        transcript (str): Transcript of the video (condensed for long videos).
+        video_info (dict): Video metadata like title, channel, etc.
+        cache (caching.CachedContent, optional): Cached transcript prefix
+            from create_transcript_cache().
+        history (list, optional): Previous Q&A turns to keep.
+
+    Returns:
+        genai.ChatSession: Chat session to pass to ask_question_stream().
+    """
+    history = list(history or [])
+    if cache is not None:
+        model = genai.GenerativeModel.from_cached_content(cached_content=cache)
+        return model.start_chat(history=history)
+
+    seed_turns = [
+        _content("user", build_video_context(transcript, video_info)),
+        _content("model", "Got it. Ask me anything about this video.")
+    ]
+    return get_qa_model().start_chat(history=seed_turns + history)
+
+
+# --------------------------------------------------------------
+# Function: ask_question_stream
+# Purpose : Answer user questions about the video within a chat
+#           session started by start_qa_chat().
+# Notes   : Keeps conversational context for up to last 10 Q&As.
+#           With a passage index, only the top-matching transcript
+#           excerpts are sent with the question, and they are dropped
+#           from history afterwards so they don't pile up every turn.
+#           If a turn fails or is blocked, history is restored so the
+#           session keeps working.
+# --------------------------------------------------------------
+def ask_question_stream(chat, question: str, index=None) -> str:
+    """
+    Ask a question in the video chat session with Gemini (streaming).
+    
+    Args:
+        chat (genai.ChatSession): Session from start_qa_chat().
+        question (str): The current user question.
+        index (tuple, optional): Passage index from
+            services.retrieval.build_passage_index().
+
+    Returns:
+        str: The final answer text.
+    """
+    # Snapshot history so a failed or blocked turn can be undone
+    previous_history = list(chat.history)
+
+    try:
+        message = question
+        if index is not None:
+            excerpts = "\n\n".join(retrieve_passages(index, question))
+            message = f"Relevant transcript excerpts:\n{excerpts}\n\nQuestion: {question}"
 
         console.print("[bold cyan]Answer:[/bold cyan]\n")
 
         # Stream the response back to console
-        response_stream = model.generate_content(prompt, stream=True)
-        final_text = ""
+        response_stream = chat.send_message(message, stream=True)
+        final_text = _stream_to_console(response_stream)
 
-        for chunk in response_stream:
-            if chunk.text:
-                # Print streamed answer in yellow
-                console.print(chunk.text, end="", style="yellow")
-                final_text += chunk.text
+        # Keep only the question in history, then keep the seed turns
+        # plus the last MAX_HISTORY_TURNS Q&A pairs
+        history = chat.history
+        if index is not None:
+            history[-2] = _content("user", question)
+        seed = 0 if chat.model.cached_content else 2
+        if len(history) > seed + 2 * MAX_HISTORY_TURNS:
+            history = history[:seed] + history[-2 * MAX_HISTORY_TURNS:]
+        chat.history = history
 
-        console.print()
         return final_text
 
     except Exception as e:
         logging.error(f"Gemini streaming Q&A error: {e}")
+        # A broken/blocked stream leaves the session unusable; restore it
+        chat.history = previous_history
         return ""
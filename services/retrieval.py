@@ -0,0 +1,122 @@
+"""
+==================================================================
+   Retrieval Service Module
+   ------------------------
+   Provides utilities for:
+   - Splitting transcripts into sentence-aligned chunks / passages
+   - Indexing transcript passages with BM25
+   - Retrieving the passages most relevant to a question
+==================================================================
+"""
+
+import re
+from rank_bm25 import BM25Okapi
+
+# Passage size (in chars) and number of passages sent per question
+PASSAGE_SIZE = 1000
+TOP_K_PASSAGES = 8
+
+# Sentence boundary: whitespace after ., !, ? or the Devanagari danda
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?।])\s+")
+_TOKEN_RE = re.compile(r"\w+")
+
+
+# --------------------------------------------------------------
+# Function: _split_units
+# Purpose : Break a transcript into units no longer than chunk_size.
+# Notes   : Auto-generated captions often have no punctuation, so
+#           sentences longer than chunk_size are split on whitespace
+#           (and words longer than chunk_size are cut by length).
+# --------------------------------------------------------------
+def _split_units(transcript: str, chunk_size: int):
+    """
+    Yield sentences, breaking any longer than chunk_size into words.
+    """
+    for sentence in _SENTENCE_END_RE.split(transcript):
+        if len(sentence) <= chunk_size:
+            yield sentence
+            continue
+        for word in sentence.split():
+            for i in range(0, len(word), chunk_size):
+                yield word[i:i + chunk_size]
+
+
+# --------------------------------------------------------------
+# Function: split_transcript
+# Purpose : Split a transcript into chunks of roughly chunk_size
+#           chars, breaking on sentence boundaries where possible.
+# --------------------------------------------------------------
+def split_transcript(transcript: str, chunk_size: int) -> list[str]:
+    """
+    Split transcript into sentence-aligned chunks.
+
+    Args:
+        transcript (str): Full transcript text.
+        chunk_size (int): Target chunk length in chars.
+
+    Returns:
+        list[str]: Transcript chunks in order.
+    """
+    chunks = []
+    current = []
+    current_len = 0
+    for unit in _split_units(transcript, chunk_size):
+        if current and current_len + len(unit) > chunk_size:
+            chunks.append(" ".join(current))
+            current, current_len = [], 0
+        current.append(unit)
+        current_len += len(unit) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+# --------------------------------------------------------------
+# Function: _tokenize
+# Purpose : Lowercase word tokens used for BM25 scoring.
+# --------------------------------------------------------------
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+# --------------------------------------------------------------
+# Function: build_passage_index
+# Purpose : Split a transcript into ~1k-char passages and build a
+#           BM25 index over them (done once per video).
+# --------------------------------------------------------------
+def build_passage_index(transcript: str) -> tuple[BM25Okapi, list[str]]:
+    """
+    Build a BM25 index over transcript passages.
+
+    Args:
+        transcript (str): Full transcript text.
+
+    Returns:
+        tuple: (BM25 index, list of passages)
+    """
+    passages = split_transcript(transcript, PASSAGE_SIZE)
+    return BM25Okapi([_tokenize(passage) for passage in passages]), passages
+
+
+# --------------------------------------------------------------
+# Function: retrieve_passages
+# Purpose : Return the top-k passages for a question.
+# Notes   : Passages are returned in transcript order so the
+#           excerpts read naturally.
+# --------------------------------------------------------------
+def retrieve_passages(index: tuple[BM25Okapi, list[str]], question: str, k: int = TOP_K_PASSAGES) -> list[str]:
+    """
+    Retrieve the passages most relevant to a question.
+
+    Args:
+        index (tuple): (BM25 index, passages) from build_passage_index().
+        question (str): User question.
+        k (int, optional): Number of passages. Defaults to TOP_K_PASSAGES.
+
+    Returns:
+        list[str]: Selected passages in transcript order.
+    """
+    bm25, passages = index
+    scores = bm25.get_scores(_tokenize(question))
+    top = sorted(range(len(passages)), key=lambda i: scores[i], reverse=True)[:k]
+    return [passages[i] for i in sorted(top)]
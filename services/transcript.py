@@ -3,45 +3,88 @@
    Transcript Service Module
    -------------------------
    Provides utilities for:
-   - Fetching YouTube transcripts via external service (youtubetotranscript.com/transcript)
-   - Transcribing audio with Whisper model if external service failed
+   - Fetching YouTube transcripts from caption tracks (youtube-transcript-api),
+     falling back to an external service (youtubetotranscript.com/transcript)
+   - Transcribing audio with Whisper model (faster-whisper) if external service failed
    - Saving transcripts with video metadata
+   - Caching transcripts on disk per video ID
 ==================================================================
 """
 
 import logging
 import requests
-import whisper
-from bs4 import BeautifulSoup
+from utils.http import session
+from utils.cache import read_cache, write_cache
+from faster_whisper import WhisperModel
+import lxml.etree
+import lxml.html
+from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound
 import os
+import threading
+from rich.console import Console
+
+# Rich console for printing partial transcripts as they arrive
+console = Console()
 
 # Cached Whisper model (loaded once and reused to save memory/time)
 _whisper_model = None 
+_whisper_lock = threading.Lock()
+
+# Caption languages preferred over whatever track YouTube lists first
+PREFERRED_CAPTION_LANGUAGES = ["en", "en-US", "en-GB"]
+
+# Where the latest transcript (with metadata) is saved
+TRANSCRIPT_PATH = "data/transcript.txt"
+TRANSCRIPT_TMP_PATH = TRANSCRIPT_PATH + ".tmp"
 
 
 # --------------------------------------------------------------
 # Function: get_whisper_model
 # Purpose : Lazily load and return a Whisper model instance.
-# Notes   : Uses the "small" model for efficiency.
+# Notes   : Uses the "small" model via faster-whisper (CTranslate2)
+#           with int8 quantization for fast CPU inference.
+#           Thread-safe: a call made while preloading waits for it.
 # --------------------------------------------------------------
 def get_whisper_model():
     """
     Load Whisper model only once and reuse it.
     
     Returns:
-        whisper.Whisper: Loaded Whisper model instance.
+        WhisperModel: Loaded faster-whisper model instance.
     """
     global _whisper_model
     if _whisper_model is None:
-        _whisper_model = whisper.load_model("small")
+        with _whisper_lock:
+            if _whisper_model is None:
+                _whisper_model = WhisperModel("small", device="cpu", compute_type="int8")
     return _whisper_model
 
 
+# --------------------------------------------------------------
+# Function: preload_whisper_model
+# Purpose : Start loading the Whisper model in a background thread
+#           so it is ready if captions turn out to be missing.
+# --------------------------------------------------------------
+def preload_whisper_model():
+    """
+    Load the Whisper model in a daemon thread.
+    """
+    def _load():
+        try:
+            get_whisper_model()
+        except Exception as e:
+            logging.warning(f"Whisper model preload failed: {e}")
+
+    threading.Thread(target=_load, daemon=True).start()
+
+
 # --------------------------------------------------------------
 # Function: save_transcript_with_metadata
 # Purpose : Save transcript into a file with YouTube video metadata
 #           written at the top for context.
 # Notes   : Description is truncated to 150 chars if too long.
+#           Encoded once and written to a temp file, then swapped in
+#           atomically so a crash never leaves a partial transcript.
 # --------------------------------------------------------------
 def save_transcript_with_metadata(video_info: dict, transcript: str):
     """
@@ -60,36 +103,149 @@ def save_transcript_with_metadata(video_info: dict, transcript: str):
         if len(description) > 150:
             description = description[:150] + "..."
 
+        payload = (
+            f"Title: {video_info['title']}\n"
+            f"Channel: {video_info['channel']}\n"
+            f"Views: {video_info['views']}\n"
+            f"Description: {description}\n\n"
+            f"Transcript:\n\n{transcript}"
+        ).encode("utf-8")
+
         # Save transcript and metadata into a text file
-        with open("data/transcript.txt", "w", encoding="utf-8") as f:
-            f.write(
-                f"Title: {video_info['title']}\n"
-                f"Channel: {video_info['channel']}\n"
-                f"Views: {video_info['views']}\n"
-                f"Description: {description}\n\n"
-                f"Transcript:\n\n{transcript}"
-            )
+        with open(TRANSCRIPT_TMP_PATH, "wb", buffering=1 << 20) as f:
+            f.write(payload)
+        os.replace(TRANSCRIPT_TMP_PATH, TRANSCRIPT_PATH)
     except Exception as e:
         logging.error(f"Error saving transcript: {e}")
 
 
 # --------------------------------------------------------------
-# Function: get_youtube_transcript
-# Purpose : Fetch transcript directly from youtubetotranscript.com
-#           using the video URL.
-# Returns : (transcript_text, source_type)
-#           - source_type = "auto" if generated, None otherwise.
+# Function: get_cached_transcript / cache_transcript
+# Purpose : Read / write a video's transcript in the disk cache
+#           (data/cache/<video_id>.txt, language in <video_id>.lang)
+#           so repeat runs skip fetching and transcribing entirely.
+# Notes   : A cache hit also rewrites data/transcript.txt so it
+#           always holds the video currently being processed.
 # --------------------------------------------------------------
-def get_youtube_transcript(url: str) -> tuple[str, str | None]:
+def get_cached_transcript(url: str) -> tuple[str, str | None]:
     """
-    Fetch a transcript from YouTube using an external service.
+    Return the cached transcript for a video URL.
 
     Args:
         url (str): YouTube video URL.
 
     Returns:
-        tuple: (transcript text, source type) 
-               where source type is "auto" or None.
+        tuple: (transcript text, language), or ("", None) if not cached.
+    """
+    # Import lazily to avoid circular dependency
+    from services.youtube import get_video_id, get_video_info
+
+    video_id = get_video_id(url)
+    transcript = read_cache(video_id, "txt") if video_id else None
+    if not transcript:
+        return "", None
+
+    save_transcript_with_metadata(get_video_info(url), transcript)
+    return transcript, read_cache(video_id, "lang") or "cached"
+
+
+def cache_transcript(url: str, transcript: str, lang: str):
+    """
+    Store a video's transcript and its language in the disk cache.
+
+    Args:
+        url (str): YouTube video URL.
+        transcript (str): Transcript text to cache.
+        lang (str): Transcript language / source type.
+    """
+    # Import lazily to avoid circular dependency
+    from services.youtube import get_video_id
+
+    video_id = get_video_id(url)
+    if video_id:
+        write_cache(video_id, "txt", transcript)
+        write_cache(video_id, "lang", lang)
+
+
+# --------------------------------------------------------------
+# Function: _pick_caption_track
+# Purpose : Choose the best caption track from a video's track list.
+# Notes   : Order: preferred language (manual before auto-generated),
+#           then the auto-generated track (the original spoken
+#           language), then whatever track is listed first.
+# --------------------------------------------------------------
+def _pick_caption_track(transcript_list):
+    """
+    Pick a caption track, avoiding arbitrary community translations.
+
+    Args:
+        transcript_list (TranscriptList): Tracks from YouTubeTranscriptApi.list().
+
+    Returns:
+        Transcript: Selected caption track.
+    """
+    try:
+        return transcript_list.find_transcript(PREFERRED_CAPTION_LANGUAGES)
+    except NoTranscriptFound:
+        pass
+
+    tracks = list(transcript_list)
+    generated = [track for track in tracks if track.is_generated]
+    return (generated or tracks)[0]
+
+
+# --------------------------------------------------------------
+# Function: _fetch_timedtext_transcript
+# Purpose : Fetch captions straight from YouTube's timedtext data
+#           via youtube-transcript-api (no HTML parsing).
+# Notes   : Track choice is done by _pick_caption_track(). Uses its own
+#           requests.Session since the API client is not thread-safe
+#           and mutates the session's headers / cookies.
+# --------------------------------------------------------------
+def _fetch_timedtext_transcript(url: str) -> tuple[str, str | None]:
+    """
+    Fetch a transcript from YouTube's caption tracks.
+
+    Args:
+        url (str): YouTube video URL.
+
+    Returns:
+        tuple: (transcript text, language code), or ("", None) on failure.
+    """
+    # Import lazily to avoid circular dependency
+    from services.youtube import get_video_id
+
+    video_id = get_video_id(url)
+    if not video_id:
+        return "", None
+
+    try:
+        api = YouTubeTranscriptApi(http_client=requests.Session())
+        track = _pick_caption_track(api.list(video_id))
+        snippets = track.fetch()
+    except Exception as e:
+        logging.warning(f"YouTube caption fetch failed: {e}")
+        return "", None
+
+    texts = (snippet.text.strip() for snippet in snippets)
+    transcript = " ".join(text for text in texts if text)
+    return (transcript, track.language_code) if transcript else ("", None)
+
+
+# --------------------------------------------------------------
+# Function: _fetch_scraped_transcript
+# Purpose : Fetch transcript from youtubetotranscript.com by
+#           scraping its HTML response.
+# --------------------------------------------------------------
+def _fetch_scraped_transcript(url: str) -> str:
+    """
+    Fetch a transcript from youtubetotranscript.com.
+
+    Args:
+        url (str): YouTube video URL.
+
+    Returns:
+        str: Transcript text, or empty string on failure.
     """
     transcript_url = "https://youtubetotranscript.com/transcript"
     headers = {
@@ -101,38 +257,98 @@ def get_youtube_transcript(url: str) -> tuple[str, str | None]:
 
     # Try to fetch transcript HTML
     try:
-        response = requests.post(transcript_url, headers=headers, data={"youtube_url": url}, timeout=30)
+        response = session.post(transcript_url, headers=headers, data={"youtube_url": url}, timeout=30)
         response.raise_for_status()
     except requests.RequestException as e:
         logging.error(f"Transcript fetch request failed: {e}")
+        return ""
+
+    # Parse HTML response for transcript segments (lxml's C parser + XPath).
+    # Decode explicitly as UTF-8: without a <meta charset> libxml2 would
+    # fall back to Latin-1 and garble non-ASCII (e.g. Hindi) text.
+    segments = []
+    try:
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        tree = lxml.html.fromstring(response.content, parser=parser)
+        segments = tree.xpath('//span[contains(concat(" ", normalize-space(@class), " "), " transcript-segment ")]')
+    except lxml.etree.ParserError as e:
+        # Empty / whitespace-only body ("Document is empty")
+        logging.warning(f"Transcript HTML could not be parsed: {e}")
+
+    if not segments:
+        logging.warning("No transcript found.")
+        return ""
+
+    # Join text from all transcript segments
+    texts = (seg.text_content().strip() for seg in segments)
+    return " ".join(text for text in texts if text)
+
+
+# --------------------------------------------------------------
+# Function: get_youtube_transcript
+# Purpose : Fetch transcript for the video URL, first from YouTube's
+#           caption tracks, then from youtubetotranscript.com.
+# Notes   : Does not check the disk cache; use get_cached_transcript().
+# Returns : (transcript_text, source_type)
+#           - source_type = caption language code, "auto" for the
+#             youtubetotranscript.com fallback, None otherwise.
+# --------------------------------------------------------------
+def get_youtube_transcript(url: str) -> tuple[str, str | None]:
+    """
+    Fetch a transcript from YouTube captions or an external service.
+
+    Args:
+        url (str): YouTube video URL.
+
+    Returns:
+        tuple: (transcript text, source type) 
+               where source type is a language code, "auto" or None.
+    """
+    transcript, lang = _fetch_timedtext_transcript(url)
+    if not transcript:
+        transcript, lang = _fetch_scraped_transcript(url), "auto"
+
+    if not transcript:
         return "", None
 
     # Import lazily to avoid circular dependency
     from services.youtube import get_video_info
-    video_info = get_video_info(url)
+    save_transcript_with_metadata(get_video_info(url), transcript)
+    cache_transcript(url, transcript, lang)
+    return transcript, lang
 
-    # Parse HTML response for transcript segments
-    soup = BeautifulSoup(response.content, "html.parser")
-    segments = soup.find_all("span", class_="transcript-segment")
 
-    if not segments:
-        logging.warning("No transcript found.")
-        return "", None
+# --------------------------------------------------------------
+# Function: stream_whisper_transcript
+# Purpose : Transcribe audio segment by segment, yielding text
+#           as soon as each segment is decoded.
+# Notes   : faster-whisper decodes 30-second windows lazily, so
+#           segments arrive while the rest of the audio is processed.
+# --------------------------------------------------------------
+def stream_whisper_transcript(audio_file: str):
+    """
+    Transcribe an audio file segment by segment with Whisper.
 
-    # Join text from all transcript segments
-    transcript = " ".join(seg.get_text(strip=True) for seg in segments if seg.get_text(strip=True))
+    Args:
+        audio_file (str): Path to the audio file.
 
-    if transcript:
-        save_transcript_with_metadata(video_info, transcript)
-        return transcript, "auto"
+    Yields:
+        str: Transcribed text of each segment.
+    """
+    model = get_whisper_model()
+    segments, _ = model.transcribe(audio_file, language="en", beam_size=1)
 
-    return "", None
+    for segment in segments:
+        text = segment.text.strip()
+        if text:
+            yield text
 
 
 # --------------------------------------------------------------
 # Function: transcribe_with_whisper
 # Purpose : Transcribe a downloaded audio file using Whisper model.
-# Notes   : Also saves transcript with video metadata.
+# Notes   : Prints partial text per segment while transcribing.
+#           Also saves transcript with video metadata and caches it.
 # --------------------------------------------------------------
 def transcribe_with_whisper(audio_file: str, url: str) -> str:
     """
@@ -146,18 +362,21 @@ def transcribe_with_whisper(audio_file: str, url: str) -> str:
         str: Transcribed text.
     """
     try:
-        # Load Whisper model (cached after first call)
-        model = get_whisper_model()
-        result = model.transcribe(audio_file, language="en")
-        text = result.get("text", "").strip()
+        # Show each segment's text as soon as Whisper finishes it
+        parts = []
+        for partial in stream_whisper_transcript(audio_file):
+            console.print(partial, style="dim")
+            parts.append(partial)
+        text = " ".join(parts)
 
         # Import lazily to avoid circular dependency
         from services.youtube import get_video_info
         video_info = get_video_info(url)
 
-        # Save transcript if text exists
+        # Save and cache transcript if text exists
         if text:
             save_transcript_with_metadata(video_info, text)
+            cache_transcript(url, text, "auto")
 
         return text
     except Exception as e:
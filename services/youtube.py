@@ -9,11 +9,28 @@
 ==================================================================
 """
 
-import os
+import json
 import logging
+import functools
+from utils.http import session
+from utils.cache import read_cache, write_cache
+from concurrent.futures import ThreadPoolExecutor
 from pytubefix import YouTube as PTFixYouTube
 import re
 
+# Ranged download settings: slice size and number of parallel connections
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_WORKERS = 8
+
+# File extensions for audio-only stream containers
+AUDIO_EXTENSIONS = {"mp4": "m4a"}
+
+# Matches the 11-char video ID in watch, embed, shorts and youtu.be URLs
+_VIDEO_ID_RE = re.compile(
+    r"(?:youtu\.be/|youtube\.com/(?:watch\?v=|embed/|shorts/))"
+    r"([0-9A-Za-z_-]{11})"
+)
+
 
 # --------------------------------------------------------------
 # Function: get_video_id
@@ -38,18 +55,68 @@ def get_video_id(url: str) -> str | None:
     Returns:
         str | None: Extracted video ID, or None if not found.
     """
-    pattern = (
-        r"(?:youtu\.be/|youtube\.com/(?:watch\?v=|embed/|shorts/))"
-        r"([0-9A-Za-z_-]{11})"
-    )
-    match = re.search(pattern, url)
+    match = _VIDEO_ID_RE.search(url)
     return match.group(1) if match else None
 
 
+# --------------------------------------------------------------
+# Function: _fetch_video_info
+# Purpose : Fetch video metadata from YouTube via pytubefix.
+# Notes   : Raises on failure so errors are not cached.
+# --------------------------------------------------------------
+def _fetch_video_info(url: str) -> dict:
+    """
+    Fetch video metadata for a URL (uncached).
+
+    Args:
+        url (str): YouTube video URL.
+
+    Returns:
+        dict: Video metadata with keys: title, channel, views, description.
+    """
+    yt = PTFixYouTube(url)
+    return {
+        "title": yt.title,
+        "channel": yt.author,
+        "views": yt.views,
+        "description": yt.description
+    }
+
+
+# --------------------------------------------------------------
+# Function: _video_info_by_id
+# Purpose : Memoize video metadata per video ID.
+# Notes   : Backed by the disk cache (data/cache/<video_id>.json)
+#           so metadata survives across runs.
+# --------------------------------------------------------------
+@functools.lru_cache(maxsize=128)
+def _video_info_by_id(video_id: str) -> dict:
+    """
+    Fetch video metadata for a video ID (cached).
+
+    Args:
+        video_id (str): 11-char YouTube video ID.
+
+    Returns:
+        dict: Video metadata with keys: title, channel, views, description.
+    """
+    cached = read_cache(video_id, "json")
+    if cached:
+        try:
+            return json.loads(cached)
+        except ValueError as e:
+            logging.warning(f"Ignoring corrupt video info cache: {e}")
+
+    info = _fetch_video_info(f"https://youtu.be/{video_id}")
+    write_cache(video_id, "json", json.dumps(info, ensure_ascii=False))
+    return info
+
+
 # --------------------------------------------------------------
 # Function: get_video_info
 # Purpose : Fetch YouTube video metadata (title, channel, views, description).
-# Notes   : Uses pytubefix for reliability.
+# Notes   : Uses pytubefix for reliability. Results are cached per
+#           video ID, so repeated calls don't hit YouTube again.
 # --------------------------------------------------------------
 def get_video_info(url: str) -> dict:
     """
@@ -62,13 +129,11 @@ def get_video_info(url: str) -> dict:
         dict: Video metadata with keys: title, channel, views, description.
     """
     try:
-        yt = PTFixYouTube(url)
-        return {
-            "title": yt.title,
-            "channel": yt.author,
-            "views": yt.views,
-            "description": yt.description
-        }
+        video_id = get_video_id(url)
+        if not video_id:
+            return _fetch_video_info(url)
+        # Return a copy so callers can't mutate the cached entry
+        return dict(_video_info_by_id(video_id))
     except Exception as e:
         logging.error(f"Error fetching video info: {e}")
         return {
@@ -79,21 +144,103 @@ def get_video_info(url: str) -> dict:
         }
 
 
+# --------------------------------------------------------------
+# Function: _fetch_range
+# Purpose : Download one byte range of a stream into a shared buffer.
+# --------------------------------------------------------------
+def _fetch_range(stream_url: str, start: int, end: int, buffer: bytearray, cancel_event=None):
+    """
+    Fetch bytes [start, end] of the stream URL into buffer.
+
+    Args:
+        stream_url (str): Direct media URL of the stream.
+        start (int): First byte offset (inclusive).
+        end (int): Last byte offset (inclusive).
+        buffer (bytearray): Preallocated buffer for the whole file.
+        cancel_event (threading.Event, optional): Skip the fetch once set.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        return
+
+    response = session.get(stream_url, headers={"Range": f"bytes={start}-{end}"}, timeout=30)
+    response.raise_for_status()
+    if response.status_code != 206 or len(response.content) != end - start + 1:
+        raise ValueError(f"Server did not honor range {start}-{end}")
+    buffer[start:end + 1] = response.content
+
+
+# --------------------------------------------------------------
+# Function: _download_ranged
+# Purpose : Download a stream over several concurrent HTTP Range
+#           requests to get around per-connection throttling.
+# Notes   : Stops between slices once cancel_event is set.
+# --------------------------------------------------------------
+def _download_ranged(stream, filename: str, cancel_event=None) -> bool:
+    """
+    Download a pytubefix stream in parallel 1 MB slices.
+
+    Args:
+        stream (pytubefix.Stream): Audio stream to download.
+        filename (str): Output filename.
+        cancel_event (threading.Event, optional): Set to cancel the download.
+
+    Returns:
+        bool: True if the file was written, False if cancelled.
+    """
+    size = stream.filesize
+    if not size:
+        raise ValueError("Unknown stream size")
+
+    buffer = bytearray(size)
+    executor = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS)
+    try:
+        futures = [
+            executor.submit(
+                _fetch_range, stream.url, start, min(start + DOWNLOAD_CHUNK_SIZE, size) - 1, buffer, cancel_event
+            )
+            for start in range(0, size, DOWNLOAD_CHUNK_SIZE)
+        ]
+        for future in futures:
+            future.result()
+    finally:
+        # On the first failed slice, drop pending slices instead of
+        # finishing the download before the single-connection fallback
+        executor.shutdown(cancel_futures=True)
+
+    if cancel_event is not None and cancel_event.is_set():
+        return False
+
+    with open(filename, "wb") as f:
+        f.write(buffer)
+    return True
+
+
 # --------------------------------------------------------------
 # Function: download_audio
 # Purpose : Download only the audio track of a YouTube video.
-# Notes   : Default filename is "audio.mp3".
+# Notes   : Default filename is "audio.<ext>" where the extension
+#           matches the real container (e.g. "audio.m4a"), so
+#           decoders don't have to guess the format.
+#           Uses parallel ranged requests, falling back to
+#           pytubefix's single-connection download on failure.
+#           Passing cancel_event marks the download as speculative:
+#           setting it abandons the download early, and the
+#           (uncancellable) single-connection fallback is skipped.
 # --------------------------------------------------------------
-def download_audio(url: str, filename: str = "audio.mp3") -> str:
+def download_audio(url: str, filename: str | None = None, cancel_event=None) -> str:
     """
     Download the audio stream from a YouTube video.
 
     Args:
         url (str): YouTube video URL.
-        filename (str, optional): Output filename for audio. Defaults to "audio.mp3".
+        filename (str, optional): Output filename for audio.
+            Defaults to "audio" + the stream's container extension.
+        cancel_event (threading.Event, optional): Set to cancel the download.
+            When given, no single-connection fallback is attempted.
 
     Returns:
-        str: Path to the downloaded audio file, or empty string on failure.
+        str: Path to the downloaded audio file, or empty string on
+             failure or cancellation.
     """
     try:
         yt = PTFixYouTube(url)
@@ -101,9 +248,18 @@ def download_audio(url: str, filename: str = "audio.mp3") -> str:
         if not stream:
             raise ValueError("No audio streams available")
 
-        # Download temp audio and rename to desired filename
-        out_file = stream.download(filename="temp_audio.mp4")
-        os.replace(out_file, filename)
+        if filename is None:
+            filename = f"audio.{AUDIO_EXTENSIONS.get(stream.subtype, stream.subtype)}"
+
+        try:
+            if not _download_ranged(stream, filename, cancel_event):
+                return ""
+        except Exception as e:
+            if cancel_event is not None:
+                logging.warning(f"Speculative ranged download failed: {e}")
+                return ""
+            logging.warning(f"Ranged download failed, using single connection: {e}")
+            return stream.download(filename=filename)
         return filename
     except Exception as e:
         logging.error(f"Audio download error: {e}")
@@ -0,0 +1,39 @@
+from services.retrieval import (
+    split_transcript, build_passage_index, retrieve_passages,
+    PASSAGE_SIZE, TOP_K_PASSAGES
+)
+
+
+def test_split_transcript_breaks_on_sentences():
+    transcript = "First sentence here. Second one! Third? Fourth."
+    chunks = split_transcript(transcript, 25)
+    assert chunks == ["First sentence here.", "Second one! Third?", "Fourth."]
+
+
+def test_split_transcript_unpunctuated_input():
+    # Auto-generated captions usually have no punctuation at all
+    transcript = " ".join(f"word{i}" for i in range(30_000))
+    chunks = split_transcript(transcript, 15_000)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 15_000 for chunk in chunks)
+    assert " ".join(chunks) == transcript
+
+
+def test_split_transcript_cuts_overlong_words():
+    chunks = split_transcript("x" * 2500, 1000)
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+
+
+def test_retrieve_passages_unpunctuated_transcript():
+    words = [f"filler{i}" for i in range(20_000)]
+    words[15_000] = "kangaroo"
+    transcript = " ".join(words)
+
+    index = build_passage_index(transcript)
+    passages = retrieve_passages(index, "what about the kangaroo")
+
+    assert len(index[1]) > TOP_K_PASSAGES
+    assert len(passages) == TOP_K_PASSAGES
+    assert all(len(passage) <= PASSAGE_SIZE for passage in passages)
+    assert any("kangaroo" in passage for passage in passages)
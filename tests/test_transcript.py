@@ -0,0 +1,68 @@
+from unittest import mock
+
+from youtube_transcript_api import NoTranscriptFound
+
+from services import transcript
+
+
+def _fake_response(content: bytes):
+    response = mock.Mock(content=content)
+    response.raise_for_status.return_value = None
+    return response
+
+
+def test_scraped_transcript_decodes_utf8_without_meta_charset(monkeypatch):
+    html = (
+        '<html><body>'
+        '<span class="transcript-segment">नमस्ते héllo</span>'
+        '<span class="transcript-segment"> राधे-राधे। </span>'
+        '</body></html>'
+    ).encode("utf-8")
+    monkeypatch.setattr(transcript.session, "post", lambda *args, **kwargs: _fake_response(html))
+
+    assert transcript._fetch_scraped_transcript("https://youtu.be/dQw4w9WgXcQ") == "नमस्ते héllo राधे-राधे।"
+
+
+def test_scraped_transcript_empty_body(monkeypatch):
+    monkeypatch.setattr(transcript.session, "post", lambda *args, **kwargs: _fake_response(b"  \n"))
+
+    assert transcript._fetch_scraped_transcript("https://youtu.be/dQw4w9WgXcQ") == ""
+
+
+class _FakeTrack:
+    def __init__(self, language_code: str, is_generated: bool):
+        self.language_code = language_code
+        self.is_generated = is_generated
+
+
+class _FakeTrackList:
+    def __init__(self, tracks):
+        self.tracks = tracks
+
+    def __iter__(self):
+        return iter(self.tracks)
+
+    def find_transcript(self, language_codes):
+        for code in language_codes:
+            for track in self.tracks:
+                if track.language_code == code:
+                    return track
+        raise NoTranscriptFound("dQw4w9WgXcQ", language_codes, self)
+
+
+def test_pick_caption_track_prefers_english_over_first_listed():
+    tracks = [_FakeTrack("de", False), _FakeTrack("en", False), _FakeTrack("hi", True)]
+
+    assert transcript._pick_caption_track(_FakeTrackList(tracks)).language_code == "en"
+
+
+def test_pick_caption_track_falls_back_to_generated_original_language():
+    tracks = [_FakeTrack("de", False), _FakeTrack("hi", True)]
+
+    assert transcript._pick_caption_track(_FakeTrackList(tracks)).language_code == "hi"
+
+
+def test_pick_caption_track_falls_back_to_first_track():
+    tracks = [_FakeTrack("de", False), _FakeTrack("fr", False)]
+
+    assert transcript._pick_caption_track(_FakeTrackList(tracks)).language_code == "de"
@@ -0,0 +1,34 @@
+import logging
+import os
+import pathlib
+
+# Per-video disk cache (transcripts, metadata) keyed by the 11-char video ID
+CACHE_DIR = pathlib.Path("data/cache")
+
+
+def read_cache(video_id: str, ext: str) -> str | None:
+    """
+    Return cached text for a video, or None if it isn't cached.
+    """
+    path = CACHE_DIR / f"{video_id}.{ext}"
+    try:
+        return path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logging.warning(f"Error reading cache file {path}: {e}")
+        return None
+
+
+def write_cache(video_id: str, ext: str, text: str):
+    """
+    Store text for a video in the cache (written atomically).
+    """
+    path = CACHE_DIR / f"{video_id}.{ext}"
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(text.encode("utf-8"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"Error writing cache file {path}: {e}")
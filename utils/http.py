@@ -0,0 +1,8 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared HTTP session so repeated requests reuse pooled keep-alive connections
+session = requests.Session()
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+session.mount("https://", adapter)
+session.mount("http://", adapter)